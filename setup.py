@@ -21,5 +21,6 @@ setup(
         ],
         "tifffile": ["tifffile>=2021.10.12", "zarr>=2.10.1"],
         "openslide": ["openslide-python>=1.1.1"],
+        "simd": ["pillow-simd"],
     },
 )
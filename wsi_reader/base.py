@@ -1,8 +1,58 @@
 import abc
+import bisect
 import cv2
+import importlib.util
 import numpy as np
-
-from typing import List, Optional, Tuple, Union
+import os
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Sequence, Tuple, Union
+
+if importlib.util.find_spec("PIL") is not None:
+    from PIL import Image
+
+    # Pillow-SIMD is versioned with a ".postN" suffix; stock Pillow is slower than OpenCV.
+    _PILLOW_SIMD = ".post" in Image.__version__
+    _PIL_INTERPOLATION = {
+        cv2.INTER_NEAREST: Image.NEAREST,
+        cv2.INTER_CUBIC: Image.BICUBIC,
+    }
+else:
+    _PILLOW_SIMD = False
+
+# number of native tiles per side of the supertiles read by WSIReader.get_downsampled_slide
+_SUPERTILE_TILES = 16
+# supertile side in level pixels for slides that don't report their tile dimensions
+_SUPERTILE_FALLBACK_SIZE = 4096
+
+
+def _resize(array: np.ndarray, size: Tuple[int, int], interpolation: int) -> np.ndarray:
+    """Resize an image, using Pillow-SIMD when available and OpenCV otherwise. Boolean masks are always resized with nearest neighbour interpolation.
+
+    Args:
+        array (np.ndarray): image to resize.
+        size (Tuple[int, int]): output size as a (width, height) tuple.
+        interpolation (int): OpenCV interpolation flag.
+
+    Returns:
+        np.ndarray: the resized image.
+    """
+    if array.ndim == 2 and array.size and not any(array.strides):
+        # constant masks, e.g. broadcast views, stay views of their single value
+        return np.broadcast_to(array[0, 0], size[::-1])
+    if array.dtype == np.bool_:
+        # bool and uint8 share the same itemsize, so the mask can be reinterpreted without a copy
+        return cv2.resize(
+            array.view(np.uint8), size, interpolation=cv2.INTER_NEAREST
+        ).astype(bool)
+    if (
+        _PILLOW_SIMD
+        and array.dtype == np.uint8
+        and (array.ndim == 2 or array.shape[2] in (3, 4))
+    ):
+        image = Image.fromarray(array).resize(size, _PIL_INTERPOLATION[interpolation])
+        return np.array(image)
+    return cv2.resize(array, size, interpolation=interpolation)
 
 
 class WSIReader(metaclass=abc.ABCMeta):
@@ -41,22 +91,20 @@ class WSIReader(metaclass=abc.ABCMeta):
             downsample_level_0 (bool, optional): True to render the region by downsampling from level 0. Defaults to False.
 
         Returns:
-            Tuple[np.ndarray, np.ndarray]: tuple of pixel data and alpha mask of the specified region.
+            Tuple[np.ndarray, np.ndarray]: tuple of pixel data and alpha mask of the specified region. The alpha mask may be a read-only view.
         """
-        if isinstance(tile_size, int):
-            tile_size = (tile_size, tile_size)
+        tile_size = self._as_wh(tile_size)
 
+        dims = self.level_dimensions
         x, y = x_y
         if downsample_level_0 and level > 0:
-            downsample = round(
-                self.level_dimensions[0][0] / self.level_dimensions[level][0]
-            )
+            downsample = round(dims[0][0] / dims[level][0])
             x, y = x * downsample, y * downsample
             tile_w, tile_h = tile_size[0] * downsample, tile_size[1] * downsample
-            width, height = self.level_dimensions[0]
+            width, height = dims[0]
         else:
             tile_w, tile_h = tile_size
-            width, height = self.level_dimensions[level]
+            width, height = dims[level]
 
         tile_w = tile_w + x if x < 0 else tile_w
         tile_h = tile_h + y if y < 0 else tile_h
@@ -73,30 +121,80 @@ class WSIReader(metaclass=abc.ABCMeta):
             tile_h = tile_h // downsample
             x = x // downsample
             y = y // downsample
-            tile = cv2.resize(tile, (tile_w, tile_h), interpolation=cv2.INTER_CUBIC)
-            alfa_mask = cv2.resize(
-                alfa_mask.astype(np.uint8),
-                (tile_w, tile_h),
-                interpolation=cv2.INTER_CUBIC,
-            ).astype(bool)
-
-        if normalize:
-            tile = self._normalize(tile)
+            tile = _resize(tile, (tile_w, tile_h), cv2.INTER_CUBIC)
+            alfa_mask = _resize(alfa_mask, (tile_w, tile_h), cv2.INTER_NEAREST)
 
         padding = [
             (y - x_y[1], tile_size[1] - tile_h + min(x_y[1], 0)),
             (x - x_y[0], tile_size[0] - tile_w + min(x_y[0], 0)),
         ]
-        tile = np.pad(
-            tile,
-            padding + [(0, 0)] * (len(tile.shape) - 2),
-            "constant",
-            constant_values=0,
-        )
-        alfa_mask = np.pad(alfa_mask, padding, "constant", constant_values=0)
+        if any(any(p) for p in padding):
+            # normalization is fused with the copy into the padded buffer
+            tile = self._pad(tile, padding, normalize)
+            alfa_mask = self._pad(alfa_mask, padding)
+        elif normalize:
+            tile = self._normalize(tile)
 
         return tile, alfa_mask
 
+    def read_regions(
+        self,
+        coords: np.ndarray,
+        level: int,
+        tile_size: Union[Tuple[int, int], int],
+        normalize: bool = True,
+        max_workers: Optional[int] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Reads the contens of a batch of regions with the same size in the slide from the given level.
+
+        Args:
+            coords (np.ndarray): array of shape (N, 2) with the coordinates of the top left pixel of each region in the given level reference frame.
+            level (int): the desired level.
+            tile_size (Union[Tuple[int, int], int]): size of the regions. Can be a tuple in the format (width, height) or a single scalar to specify square regions.
+            normalize (bool, optional): True to normalize the pixel values in therange [0,1]. Defaults to True.
+            max_workers (Optional[int], optional): maximum number of threads used to read the regions. Defaults to None.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: tuple of pixel data of shape (N, H, W, C) and alpha masks of shape (N, H, W) of the specified regions.
+        """
+        tile_size = self._as_wh(tile_size)
+
+        # clip the whole batch at once against the level bounds
+        self._cache_level_arrays()
+        coords = np.asarray(coords, dtype=np.int64).reshape(-1, 2)
+        level_size = (self._level_widths[level], self._level_heights[level])
+        starts = np.maximum(coords, 0)
+        sizes = np.minimum(coords + tile_size, level_size) - starts
+        offsets = (starts - coords).tolist()
+        regions = [
+            ((x, y), (tile_w, tile_h))
+            for (x, y), (tile_w, tile_h) in zip(starts.tolist(), sizes.tolist())
+        ]
+
+        results = self._read_regions(regions, level, max_workers)
+
+        channels = results[0][0].shape[2:] if results else (self.n_channels,)
+        dtype = (
+            np.dtype(np.float32)
+            if normalize and np.issubdtype(self.dtype, np.integer)
+            else self.dtype
+        )
+        tiles = np.zeros((len(regions), tile_size[1], tile_size[0]) + channels, dtype)
+        alfa_masks = np.zeros((len(regions), tile_size[1], tile_size[0]), dtype=bool)
+        for i, (region, (left, top), (tile, alfa_mask)) in enumerate(
+            zip(regions, offsets, results)
+        ):
+            tile_w, tile_h = region[1]
+            if normalize:
+                self._normalize(
+                    tile, tiles[i, top : top + tile_h, left : left + tile_w]
+                )
+            else:
+                tiles[i, top : top + tile_h, left : left + tile_w] = tile
+            alfa_masks[i, top : top + tile_h, left : left + tile_w] = alfa_mask
+
+        return tiles, alfa_masks
+
     def read_region_ds(
         self,
         x_y: Tuple[int, int],
@@ -120,8 +218,7 @@ class WSIReader(metaclass=abc.ABCMeta):
         if downsample <= 0:
             raise RuntimeError("Downsample factor must be positive")
 
-        if not isinstance(tile_size, tuple):
-            tile_size = (tile_size, tile_size)
+        tile_size = self._as_wh(tile_size)
 
         if downsample == 1:
             downsample_level_0 = False
@@ -146,10 +243,8 @@ class WSIReader(metaclass=abc.ABCMeta):
             tile, alfa_mask = self.read_region(
                 x_y_level, level, tile_size_level, False, downsample_level_0
             )
-            tile = cv2.resize(tile, tile_size, interpolation=cv2.INTER_CUBIC)
-            alfa_mask = cv2.resize(
-                alfa_mask.astype(np.uint8), tile_size, interpolation=cv2.INTER_CUBIC
-            ).astype(bool)
+            tile = _resize(tile, tile_size, cv2.INTER_CUBIC)
+            alfa_mask = _resize(alfa_mask, tile_size, cv2.INTER_NEAREST)
 
         if normalize:
             tile = self._normalize(tile)
@@ -162,6 +257,20 @@ class WSIReader(metaclass=abc.ABCMeta):
     ) -> Tuple[np.ndarray, np.ndarray]:
         raise NotImplementedError
 
+    def _read_regions(
+        self,
+        regions: List[Tuple[Tuple[int, int], Tuple[int, int]]],
+        level: int,
+        max_workers: Optional[int],
+    ) -> List[Tuple[np.ndarray, np.ndarray]]:
+        with ThreadPoolExecutor(max_workers) as executor:
+            return list(
+                executor.map(
+                    lambda region: self._read_region(region[0], level, region[1]),
+                    regions,
+                )
+            )
+
     def get_best_level_for_downsample(self, downsample: float) -> int:
         """Return the best level for the given downsample factor.
 
@@ -171,14 +280,9 @@ class WSIReader(metaclass=abc.ABCMeta):
         Returns:
             int: the level.
         """
-        if downsample < self.level_downsamples[0]:
-            return 0
-
-        for i in range(1, self.level_count):
-            if downsample < self.level_downsamples[i]:
-                return i - 1
-
-        return self.level_count - 1
+        level_downsamples = self.level_downsamples
+        i = bisect.bisect_right(level_downsamples, downsample) - 1
+        return max(0, min(i, len(level_downsamples) - 1))
 
     def get_downsampled_slide(
         self, dims: Tuple[int, int], normalize: bool = True
@@ -193,12 +297,57 @@ class WSIReader(metaclass=abc.ABCMeta):
             Tuple[np.ndarray, np.ndarray]: tuple of pixel data and alpha mask of the downsampled slide.
         """
         downsample = min(a / b for a, b in zip(self.level_dimensions[0], dims))
-        slide_downsampled, alfa_mask = self.read_region_ds(
-            (0, 0),
-            downsample,
-            self.get_dimensions_for_downsample(downsample),
-            normalize=normalize,
+        width, height = self.get_dimensions_for_downsample(downsample)
+        level = self.get_best_level_for_downsample(downsample)
+        level_width, level_height = self.level_dimensions[level]
+        scale = downsample / self.level_downsamples[level]
+
+        # the slide is read in supertiles spanning several native tiles, which are resized in parallel
+        try:
+            supertile_level_size = max(self.tile_dimensions[level]) * _SUPERTILE_TILES
+        except KeyError:
+            supertile_level_size = _SUPERTILE_FALLBACK_SIZE
+        supertile_size = max(1, int(supertile_level_size / scale))
+        dtype = (
+            np.dtype(np.float32)
+            if normalize and np.issubdtype(self.dtype, np.integer)
+            else self.dtype
         )
+        channels = (self.n_channels,) if self.n_channels > 1 else ()
+        slide_downsampled = np.zeros((height, width) + channels, dtype=dtype)
+        alfa_mask = np.zeros((height, width), dtype=bool)
+
+        boxes = []
+        regions = []
+        for y in range(0, height, supertile_size):
+            for x in range(0, width, supertile_size):
+                w, h = min(supertile_size, width - x), min(supertile_size, height - y)
+                x_level, y_level = round(x * scale), round(y * scale)
+                w_level = max(min(round((x + w) * scale), level_width) - x_level, 1)
+                h_level = max(min(round((y + h) * scale), level_height) - y_level, 1)
+                boxes.append((x, y, w, h))
+                regions.append(((x_level, y_level), (w_level, h_level)))
+
+        # reading goes through the backend batching, only the resize and stitch run in the pool
+        supertiles = self._read_regions(regions, level, os.cpu_count())
+
+        def stitch_supertile(
+            box: Tuple[int, int, int, int], supertile: Tuple[np.ndarray, np.ndarray]
+        ) -> None:
+            x, y, w, h = box
+            tile, tile_mask = supertile
+            if tile_mask.shape != (h, w):
+                tile = _resize(tile, (w, h), cv2.INTER_CUBIC)
+                tile_mask = _resize(tile_mask, (w, h), cv2.INTER_NEAREST)
+            if normalize:
+                self._normalize(tile, slide_downsampled[y : y + h, x : x + w])
+            else:
+                slide_downsampled[y : y + h, x : x + w] = tile
+            alfa_mask[y : y + h, x : x + w] = tile_mask
+
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            list(executor.map(stitch_supertile, boxes, supertiles))
+
         return slide_downsampled, alfa_mask
 
     def get_dimensions_for_downsample(self, downsample: float) -> Tuple[int, int]:
@@ -228,8 +377,8 @@ class WSIReader(metaclass=abc.ABCMeta):
 
     @property
     @abc.abstractmethod
-    def level_dimensions(self) -> List[Tuple[int, int]]:
-        """Slide dimensions for each slide level as a list of (width, height) tuples."""
+    def level_dimensions(self) -> Sequence[Tuple[int, int]]:
+        """Slide dimensions for each slide level as a sequence of (width, height) tuples."""
         raise NotImplementedError
 
     @property
@@ -265,11 +414,11 @@ class WSIReader(metaclass=abc.ABCMeta):
         raise NotImplementedError
 
     @property
-    def level_downsamples(self) -> List[float]:
-        """Return a list of downsample factors for each level of the slide.
+    def level_downsamples(self) -> Sequence[float]:
+        """Return a sequence of downsample factors for each level of the slide.
 
         Returns:
-            List[float]: The list of downsample factors.
+            Sequence[float]: The sequence of downsample factors.
         """
         if not hasattr(self, "_level_downsamples"):
             self._level_downsamples = []
@@ -280,8 +429,49 @@ class WSIReader(metaclass=abc.ABCMeta):
                 self._level_downsamples.append(ds)
         return self._level_downsamples
 
+    def _cache_level_arrays(self) -> None:
+        """Cache the level widths and heights as numpy arrays for vectorized lookups."""
+        if hasattr(self, "_level_widths"):
+            return
+        dims = np.asarray(self.level_dimensions, dtype=np.int64).reshape(-1, 2)
+        self._level_widths = dims[:, 0]
+        self._level_heights = dims[:, 1]
+
+    @staticmethod
+    def _as_wh(tile_size: Union[Tuple[int, int], int]) -> Tuple[int, int]:
+        # exact type check first: it is the common case and cheaper than isinstance
+        if type(tile_size) is tuple:
+            return tile_size
+        if isinstance(tile_size, (int, np.integer)):
+            return tile_size, tile_size
+        tile_w, tile_h = tile_size
+        return tile_w, tile_h
+
+    @staticmethod
+    def _pad(
+        array: np.ndarray, padding: List[Tuple[int, int]], normalize: bool = False
+    ) -> np.ndarray:
+        (top, bottom), (left, right) = padding
+        h, w = array.shape[:2]
+        normalize = normalize and np.issubdtype(array.dtype, np.integer)
+        padded = np.zeros(
+            (top + h + bottom, left + w + right) + array.shape[2:],
+            dtype=np.float32 if normalize else array.dtype,
+        )
+        if normalize:
+            WSIReader._normalize(array, padded[top : top + h, left : left + w])
+        else:
+            padded[top : top + h, left : left + w] = array
+        return padded
+
     @staticmethod
-    def _normalize(pixels: np.ndarray) -> np.ndarray:
+    def _normalize(pixels: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
         if np.issubdtype(pixels.dtype, np.integer):
-            pixels = (pixels / 255).astype(np.float32)
+            if out is None:
+                out = np.empty(pixels.shape, np.float32)
+            np.multiply(pixels, np.float32(1 / 255), out=out, dtype=np.float32)
+            return out
+        if out is not None:
+            out[...] = pixels
+            return out
         return pixels
@@ -1,21 +1,68 @@
+import cv2
+import ctypes
 import numpy as np
-import openslide 
+import openslide
+import sys
+import threading
 
 from os import PathLike
-from typing import List, Optional, Tuple, Union
+from typing import List, Optional, Sequence, Tuple, Union
 
 from .base import WSIReader
 
+# capacity of the tile cache shared by all the readers that don't provide their own
+_SHARED_CACHE_BYTES = 512 * 2**20
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def _get_shared_cache() -> Optional["openslide.OpenSlideCache"]:
+    """Return the tile cache shared by the readers, creating it on first use.
+
+    Returns:
+        Optional[openslide.OpenSlideCache]: the shared cache or None if the installed OpenSlide doesn't support caches.
+    """
+    global _shared_cache
+    if not hasattr(openslide, "OpenSlideCache"):
+        return None
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            try:
+                _shared_cache = openslide.OpenSlideCache(_SHARED_CACHE_BYTES)
+            except openslide.lowlevel.OpenSlideVersionError:
+                return None
+    return _shared_cache
+
+
 class OpenslideReader(WSIReader):
     """Implementation of the WSIReader interface backed by openslide"""
 
-    def __init__(self, slide_path: Union[PathLike, str], **kwargs) -> None:
+    # the low level call writes premultiplied ARGB words, i.e. BGRA bytes on little endian machines
+    _lowlevel_read_region = (
+        getattr(openslide.lowlevel, "_read_region", None)
+        if sys.byteorder == "little"
+        else None
+    )
+
+    def __init__(
+        self,
+        slide_path: Union[PathLike, str],
+        cache: Optional["openslide.OpenSlideCache"] = None,
+        **kwargs
+    ) -> None:
         """Open a slide. The object may be used as a context manager, in which case it will be closed upon exiting the context.
 
         Args:
             slide_path (Union[PathLike, str]): Path of the slide to open.
+            cache (Optional[openslide.OpenSlideCache], optional): Cache of decoded tiles, which can be shared between slides. If None a 512 MiB cache shared by all the readers is used. Requires OpenSlide >= 4.0, otherwise the default cache of the library is used. Defaults to None.
         """
         self._slide = openslide.open_slide(str(slide_path))
+        if cache is None:
+            cache = _get_shared_cache()
+        if cache is not None and hasattr(self._slide, "set_cache"):
+            self._slide.set_cache(cache)
+        # ImageSlide instances, used for plain image files, have no low level handle
+        self._osr = getattr(self._slide, "_osr", None)
 
     def close(self) -> None:
         self._slide.close()
@@ -25,16 +72,43 @@ class OpenslideReader(WSIReader):
     def _read_region(
         self, x_y: Tuple[int, int], level: int, tile_size: Tuple[int, int]
     ) -> Tuple[np.ndarray, np.ndarray]:
-        tile = np.array(self._slide.read_region(x_y, level, tile_size), dtype=np.uint8)
-        alfa_mask = tile[:, :, 3] > 0
-        tile = tile[:, :, :3]
+        # openslide expects the coordinates in the level 0 reference frame
+        ds = self.level_downsamples[level]
+        x_y = (round(x_y[0] * ds), round(x_y[1] * ds))
+        tile_w, tile_h = tile_size
+        if tile_w == 0 or tile_h == 0:
+            # regions clipped away at the slide edge, OpenCV rejects empty buffers
+            return np.empty((tile_h, tile_w, 3), np.uint8), np.zeros(
+                (tile_h, tile_w), bool
+            )
+        if self._lowlevel_read_region is None or self._osr is None:
+            image = self._slide.read_region(x_y, level, tile_size)
+            buf = np.frombuffer(image.tobytes("raw", "RGBA"), dtype=np.uint8)
+            buf = buf.reshape(tile_h, tile_w, 4)
+            alfa_mask = buf[:, :, 3] > 0
+            tile = cv2.cvtColor(buf, cv2.COLOR_RGBA2RGB)
+            return tile, alfa_mask
+
+        buf = np.empty((tile_h, tile_w, 4), dtype=np.uint8)
+        self._lowlevel_read_region(
+            self._osr,
+            buf.ctypes.data_as(ctypes.POINTER(ctypes.c_uint32)),
+            x_y[0],
+            x_y[1],
+            level,
+            tile_w,
+            tile_h,
+        )
+        alfa_mask = buf[:, :, 3] > 0
+        cv2.cvtColor(buf, cv2.COLOR_mRGBA2RGBA, dst=buf)
+        tile = cv2.cvtColor(buf, cv2.COLOR_BGRA2RGB)
         return tile, alfa_mask
 
     def get_best_level_for_downsample(self, downsample: float) -> int:
         return self._slide.get_best_level_for_downsample(downsample)
 
     @property
-    def level_dimensions(self) -> List[Tuple[int, int]]:
+    def level_dimensions(self) -> Sequence[Tuple[int, int]]:
         return self._slide.level_dimensions
 
     @property
@@ -58,18 +132,18 @@ class OpenslideReader(WSIReader):
         return 3
 
     @property
-    def level_downsamples(self) -> List[float]:
-        """Return a list of downsample factors for each level of the slide.
+    def level_downsamples(self) -> Sequence[float]:
+        """Return a sequence of downsample factors for each level of the slide.
 
         Returns:
-            List[float]: The list of downsample factors.
+            Sequence[float]: The sequence of downsample factors.
         """
         return self._slide.level_downsamples
 
     @property
     def tile_dimensions(self) -> List[Tuple[int, int]]:
         if not hasattr(self, "_tile_dimensions"):
-            self._tile_dimensions = []
+            tile_dimensions = []
             for level in range(self.level_count):
                 tile_width = int(
                     self._slide.properties[f"openslide.level[{level}].tile-width"]
@@ -77,5 +151,6 @@ class OpenslideReader(WSIReader):
                 tile_height = int(
                     self._slide.properties[f"openslide.level[{level}].tile-height"]
                 )
-                self._tile_dimensions.append((tile_width, tile_height))
+                tile_dimensions.append((tile_width, tile_height))
+            self._tile_dimensions = tile_dimensions
         return self._tile_dimensions
@@ -1,9 +1,11 @@
+import cv2
 import os
 import numpy as np
+import threading
 
 from os import PathLike
 from pathlib import Path
-from typing import List, Optional, Tuple, Union
+from typing import Dict, List, Optional, Sequence, Tuple, Union
 
 from pixelengine import PixelEngine
 from softwarerendercontext import SoftwareRenderContext
@@ -53,6 +55,19 @@ class IsyntaxReader(WSIReader):
         self._view = self._pe["in"]["WSI"].source_view
         trunc_bits = {0: [0, 0, 0]}
         self._view.truncation(False, False, trunc_bits)
+        self._scratch = threading.local()
+        level_dimensions = []
+        level_downsamples = []
+        for level in range(self.level_count):
+            dimension_ranges = self._view.dimension_ranges(level)
+            x_step, x_end = dimension_ranges[0][1:]
+            y_step, y_end = dimension_ranges[1][1:]
+            range_x = (x_end + 1) // x_step
+            range_y = (y_end + 1) // y_step
+            level_dimensions.append((range_x, range_y))
+            level_downsamples.append(float(x_step))
+        self._level_dimensions = tuple(level_dimensions)
+        self._level_downsamples = tuple(level_downsamples)
 
     def close(self) -> None:
         """Close the slide.
@@ -63,10 +78,6 @@ class IsyntaxReader(WSIReader):
         self._pe["in"].close()
         if hasattr(self, "_tile_dimensions"):
             delattr(self, "_tile_dimensions")
-        if hasattr(self, "_level_dimensions"):
-            delattr(self, "_level_dimensions")
-        if hasattr(self, "_level_downsamples"):
-            delattr(self, "_level_downsamples")
 
     @property
     def tile_dimensions(self) -> List[Tuple[int, int]]:
@@ -78,38 +89,81 @@ class IsyntaxReader(WSIReader):
     def _read_region(
         self, x_y: Tuple[int, int], level: int, tile_size: Tuple[int, int]
     ) -> Tuple[np.ndarray, np.ndarray]:
-        x_start, y_start = x_y
+        return self._read_regions([(x_y, tile_size)], level, None)[0]
+
+    def _read_regions(
+        self,
+        regions: List[Tuple[Tuple[int, int], Tuple[int, int]]],
+        level: int,
+        max_workers: Optional[int],
+    ) -> List[Tuple[np.ndarray, np.ndarray]]:
         ds = self.level_downsamples[level]
-        x_start = round(x_start * ds)
-        y_start = round(y_start * ds)
-        tile_w, tile_h = tile_size
-        x_end, y_end = round(x_start + (tile_w - 1) * ds), round(
-            y_start + (tile_h - 1) * ds
-        )
-        view_range = [x_start, x_end, y_start, y_end, level]
-        regions = self._view.request_regions(
-            [view_range],
-            self._view.data_envelopes(level),
-            True,
-            [255, 255, 255],
-            self._pe.BufferType(1),
+        results: List[Tuple[np.ndarray, np.ndarray]] = [None] * len(regions)
+        view_ranges = []
+        pending_indices: Dict[Tuple[int, ...], List[int]] = {}
+        for i, ((x_start, y_start), (tile_w, tile_h)) in enumerate(regions):
+            if tile_w == 0 or tile_h == 0:
+                # regions clipped away at the slide edge, OpenCV rejects empty buffers
+                results[i] = (
+                    np.empty((tile_h, tile_w, 3), np.uint8),
+                    np.zeros((tile_h, tile_w), bool),
+                )
+                continue
+            x_start = round(x_start * ds)
+            y_start = round(y_start * ds)
+            x_end, y_end = round(x_start + (tile_w - 1) * ds), round(
+                y_start + (tile_h - 1) * ds
+            )
+            view_range = [x_start, x_end, y_start, y_end, level]
+            view_ranges.append(view_range)
+            pending_indices.setdefault(tuple(view_range), []).append(i)
+
+        # the SDK schedules all the requested regions at once and returns them as they become ready
+        pending = (
+            list(
+                self._view.request_regions(
+                    view_ranges,
+                    self._view.data_envelopes(level),
+                    True,
+                    [255, 255, 255],
+                    self._pe.BufferType(1),
+                )
+            )
+            if view_ranges
+            else []
         )
-        (region,) = self._pe.wait_any(regions)
-        tile = np.empty(np.prod(tile_size) * 4, dtype=np.uint8)
-        region.get(tile)
-        tile.shape = (tile_h, tile_w, 4)
-        return tile[:, :, :3], tile[:, :, 3] > 0
+        while pending:
+            for region in self._pe.wait_any(pending):
+                pending.remove(region)
+                i = pending_indices[tuple(region.range)].pop()
+                tile_w, tile_h = regions[i][1]
+                buf = self._scratch_buffer((tile_h, tile_w, 4))
+                region.get(buf.reshape(-1))
+                alfa_mask = np.empty((tile_h, tile_w), dtype=bool)
+                np.not_equal(buf[..., 3], 0, out=alfa_mask)
+                # the scratch buffer is reused by the next region, so the pixels are copied out
+                tile = np.empty((tile_h, tile_w, 3), dtype=np.uint8)
+                cv2.mixChannels([buf], [tile], [0, 0, 1, 1, 2, 2])
+                results[i] = (tile, alfa_mask)
+        return results
+
+    def _scratch_buffer(self, shape: Tuple[int, int, int]) -> np.ndarray:
+        """Return the RGBA buffer of the calling thread, reallocating it only when the tile size changes.
+
+        Args:
+            shape (Tuple[int, int, int]): shape of the buffer as (height, width, channels).
+
+        Returns:
+            np.ndarray: the buffer.
+        """
+        buf = getattr(self._scratch, "buf", None)
+        if buf is None or buf.shape != shape:
+            buf = np.empty(shape, dtype=np.uint8)
+            self._scratch.buf = buf
+        return buf
 
     @property
-    def level_dimensions(self) -> List[Tuple[int, int]]:
-        if not hasattr(self, "_level_dimensions"):
-            self._level_dimensions = []
-            for level in range(self.level_count):
-                x_step, x_end = self._view.dimension_ranges(level)[0][1:]
-                y_step, y_end = self._view.dimension_ranges(level)[1][1:]
-                range_x = (x_end + 1) // x_step
-                range_y = (y_end + 1) // y_step
-                self._level_dimensions.append((range_x, range_y))
+    def level_dimensions(self) -> Sequence[Tuple[int, int]]:
         return self._level_dimensions
 
     @property
@@ -129,10 +183,5 @@ class IsyntaxReader(WSIReader):
         return 3
 
     @property
-    def level_downsamples(self) -> List[float]:
-        if not hasattr(self, "_level_downsamples"):
-            self._level_downsamples = [
-                float(self._view.dimension_ranges(level)[0][1])
-                for level in range(self.level_count)
-            ]
+    def level_downsamples(self) -> Sequence[float]:
         return self._level_downsamples
@@ -1,29 +1,90 @@
+import itertools
 import numpy as np
 import re
+import threading
 import tifffile
+import weakref
 import xml.etree.ElementTree as ET
 import zarr
 
+from concurrent.futures import ThreadPoolExecutor
 from fractions import Fraction
 from os import PathLike
-from typing import List, Optional, Tuple, Union
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple, Union
 
 from .base import WSIReader
 
 
+class _SlideHandle:
+    """Opened tifffile store and zarr hierarchy shared by the TiffReader instances of the same slide."""
+
+    def __init__(
+        self, store: "tifffile.ZarrTiffStore", z: Union[zarr.Array, zarr.Group]
+    ) -> None:
+        self.store = store
+        self.z = z
+        self.refcount = 0
+
+
+# handles of the open slides keyed by (path, series, mtime, cache size)
+_handles: "weakref.WeakValueDictionary[tuple, _SlideHandle]" = (
+    weakref.WeakValueDictionary()
+)
+_handles_lock = threading.Lock()
+
+
 class TiffReader(WSIReader):
     """Implementation of the WSIReader interface backed by tifffile."""
 
-    def __init__(self, slide_path: Union[PathLike, str], series: int = 0, **kwargs) -> None:
+    def __init__(
+        self,
+        slide_path: Union[PathLike, str],
+        series: int = 0,
+        cache_bytes: Optional[int] = None,
+        **kwargs
+    ) -> None:
         """Open a slide. The object may be used as a context manager, in which case it will be closed upon exiting the context.
 
         Args:
             slide_path (Union[PathLike, str]): Path of the slide to open.
             series (int, optional): For multi-series formats, image series to open. Defaults to 0.
+            cache_bytes (Optional[int], optional): Capacity in bytes of the LRU cache of decoded chunks. If None chunks are not cached. Defaults to None.
         """
         self.series = series
-        self._store = tifffile.imread(str(slide_path), aszarr=True, series=series)
-        self._z = zarr.open(self._store, mode="r")
+        slide_path = Path(slide_path).resolve()
+        self._handle_key = (
+            str(slide_path),
+            series,
+            slide_path.stat().st_mtime_ns,
+            cache_bytes,
+        )
+        with _handles_lock:
+            handle = _handles.get(self._handle_key)
+            if handle is None:
+                store = tifffile.imread(str(slide_path), aszarr=True, series=series)
+                z = zarr.open(
+                    zarr.LRUStoreCache(store, max_size=cache_bytes)
+                    if cache_bytes is not None
+                    else store,
+                    mode="r",
+                )
+                handle = _SlideHandle(store, z)
+                _handles[self._handle_key] = handle
+            handle.refcount += 1
+        self._handle: Optional[_SlideHandle] = handle
+        self._store = handle.store
+        self._z = handle.z
+        self._level_count = len(self._z)
+        level_dimensions = []
+        for level in range(self._level_count):
+            page = self._store._data[level].pages[0]
+            level_dimensions.append((page.imagewidth, page.imagelength))
+        self._level_dimensions = tuple(level_dimensions)
+        width = self._level_dimensions[0][0]
+        self._level_downsamples = tuple(
+            float(round(width / w)) for w, _ in self._level_dimensions
+        )
 
     def close(self) -> None:
         """Close the slide.
@@ -31,15 +92,18 @@ class TiffReader(WSIReader):
         Returns:
             None
         """
-        self._store.close()
+        with _handles_lock:
+            if self._handle is not None:
+                self._handle.refcount -= 1
+                if self._handle.refcount == 0:
+                    self._store.close()
+                    if _handles.get(self._handle_key) is self._handle:
+                        del _handles[self._handle_key]
+                self._handle = None
         if hasattr(self, "_mpp"):
             delattr(self, "_mpp")
         if hasattr(self, "_tile_dimensions"):
             delattr(self, "_tile_dimensions")
-        if hasattr(self, "_level_dimensions"):
-            delattr(self, "_level_dimensions")
-        if hasattr(self, "_level_downsamples"):
-            delattr(self, "_level_downsamples")
 
     @property
     def tile_dimensions(self) -> List[Tuple[int, int]]:
@@ -55,22 +119,100 @@ class TiffReader(WSIReader):
     ) -> Tuple[np.ndarray, np.ndarray]:
         x, y = x_y
         tile_w, tile_h = tile_size
-        return self._z[level][y : y + tile_h, x : x + tile_w], np.ones(
-            (tile_h, tile_w), bool
+        z = self._z[level]
+        chunk_h, chunk_w = z.chunks[:2]
+        tile = None
+        if (
+            (tile_w, tile_h) == (chunk_w, chunk_h)
+            and x % chunk_w == 0
+            and y % chunk_h == 0
+        ):
+            tile = self._read_chunk(z, (y // chunk_h, x // chunk_w))
+        if tile is None:
+            tile = z.get_basic_selection((slice(y, y + tile_h), slice(x, x + tile_w)))
+        # every pixel is valid, a read-only broadcast view avoids allocating the mask
+        return tile, np.broadcast_to(np.True_, (tile_h, tile_w))
+
+    def _read_regions(
+        self,
+        regions: List[Tuple[Tuple[int, int], Tuple[int, int]]],
+        level: int,
+        max_workers: Optional[int],
+    ) -> List[Tuple[np.ndarray, np.ndarray]]:
+        if isinstance(self._z.store, zarr.LRUStoreCache):
+            self._prefetch(level, regions, max_workers)
+        return super()._read_regions(regions, level, max_workers)
+
+    def _prefetch(
+        self,
+        level: int,
+        regions: List[Tuple[Tuple[int, int], Tuple[int, int]]],
+        max_workers: Optional[int] = None,
+    ) -> None:
+        """Decode in parallel the chunks covering the given regions to warm the chunk cache.
+
+        Args:
+            level (int): the level of the regions.
+            regions (List[Tuple[Tuple[int, int], Tuple[int, int]]]): list of regions as ((x, y), (width, height)) tuples.
+            max_workers (Optional[int], optional): maximum number of threads used to decode the chunks. Defaults to None.
+        """
+        z = self._z[level]
+        chunk_h, chunk_w = z.chunks[:2]
+        extra_chunks = list(
+            itertools.product(
+                *(range(-(-n // c)) for n, c in zip(z.shape[2:], z.chunks[2:]))
+            )
         )
+        keys = set()
+        for (x, y), (tile_w, tile_h) in regions:
+            for row in range(y // chunk_h, (y + tile_h - 1) // chunk_h + 1):
+                for col in range(x // chunk_w, (x + tile_w - 1) // chunk_w + 1):
+                    for extra in extra_chunks:
+                        keys.add(z._chunk_key((row, col) + extra))
+
+        def fetch(key: str) -> None:
+            try:
+                z.chunk_store[key]
+            except KeyError:
+                pass
+
+        # decompression runs in C with the GIL released, so the chunks are decoded concurrently
+        with ThreadPoolExecutor(max_workers) as executor:
+            list(executor.map(fetch, keys))
+
+    @staticmethod
+    def _read_chunk(
+        z: zarr.Array, chunk_coords: Tuple[int, int]
+    ) -> Optional[np.ndarray]:
+        """Read a single chunk from the store, bypassing the zarr indexing machinery.
+
+        Args:
+            z (zarr.Array): array of the level.
+            chunk_coords (Tuple[int, int]): row and column of the chunk.
+
+        Returns:
+            Optional[np.ndarray]: the chunk or None if it can't be read directly.
+        """
+        if z.compressor is not None or z.filters:
+            return None
+        key = z._chunk_key(chunk_coords + (0,) * (z.ndim - 2))
+        try:
+            data = z.chunk_store[key]
+        except KeyError:
+            return None
+        return np.frombuffer(data, dtype=z.dtype).reshape(z.chunks).copy()
 
     @property
-    def level_dimensions(self) -> List[Tuple[int, int]]:
-        if not hasattr(self, "_level_dimensions"):
-            self._level_dimensions = []
-            for level in range(self.level_count):
-                page = self._store._data[level].pages[0]
-                self._level_dimensions.append((page.imagewidth, page.imagelength))
+    def level_dimensions(self) -> Sequence[Tuple[int, int]]:
         return self._level_dimensions
 
+    @property
+    def level_downsamples(self) -> Sequence[float]:
+        return self._level_downsamples
+
     @property
     def level_count(self) -> int:
-        return len(self._z)
+        return self._level_count
 
     @property
     def mpp(self) -> Tuple[Optional[float], Optional[float]]: